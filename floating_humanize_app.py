@@ -5,29 +5,104 @@ A system-wide floating app that works everywhere with accessibility permissions
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import subprocess
 import sys
 import json
+import re
+import socket
+import weakref
 import tkinter as tk
 from tkinter import messagebox, ttk
 import threading
-from typing import Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 import os
 import pynput
 from pynput import keyboard
+from job_profiler import JobProfiler, env_float, peak_rss_bytes
+from payload_prepass import PreparedPayload, prepare_payload, count_words, first_words
+from hotkey_listener import HotkeyProcess, DEFAULT_COMBO
+from job_scheduler import PriorityDispatcher, CancelToken, JobCancelled, INTERACTIVE, BACKGROUND
 try:
     import AppKit
     from AppKit import NSApplication, NSApp, NSWindow, NSFloatingWindowLevel, NSScreen
 except ImportError:
     print("Warning: AppKit not available - some floating features may not work")
 
+class SelectionTooLarge(Exception):
+    """The clipboard holds more text than HUMANIZE_MAX_TEXT_KB allows"""
+
+class AbortableAdapter(HTTPAdapter):
+    """HTTP adapter whose open sockets can be shut down from another thread
+    
+    Closing a session only drops idle pooled connections, so a request in
+    flight would run on until its timeout. abort() shuts down every socket
+    this adapter opened, which makes a blocked send or read fail at once.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        self._sockets = weakref.WeakSet()
+        self._sockets_lock = threading.Lock()
+        self._aborted = False
+        super().__init__(*args, **kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        adapter = self
+        
+        def tracking(connection_cls):
+            class TrackingConnection(connection_cls):
+                def connect(self):
+                    super().connect()
+                    adapter._track(self.sock)
+            return TrackingConnection
+        
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: type(pool_cls.__name__, (pool_cls,),
+                         {"ConnectionCls": tracking(pool_cls.ConnectionCls)})
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+    
+    def _track(self, sock):
+        with self._sockets_lock:
+            self._sockets.add(sock)
+            aborted = self._aborted
+        if aborted:
+            self._shutdown(sock)
+    
+    @staticmethod
+    def _shutdown(sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    
+    def abort(self):
+        """Fail every request in flight now, and any connection opened later"""
+        with self._sockets_lock:
+            self._aborted = True
+            sockets = list(self._sockets)
+        for sock in sockets:
+            self._shutdown(sock)
+
 class FloatingHumanizeApp:
     def __init__(self):
-        self.api_key = "sk_ljx30mzi36a2nb8jlfo0pd"
-        self.api_base_url = "https://api.humanizeai.pro/v1"
+        self.api_key = os.getenv("HUMANIZE_API_KEY", "sk_ljx30mzi36a2nb8jlfo0pd")
+        self.api_base_url = os.getenv("HUMANIZE_API_BASE_URL", "https://api.humanizeai.pro/v1")
+        self.recorder = None
+        if os.getenv("HUMANIZE_RECORD"):
+            from humanize_cassette import CassetteRecorder
+            self.recorder = CassetteRecorder(os.getenv("HUMANIZE_RECORD"))
         self.is_processing = False
+        self.current_job: Optional[CancelToken] = None
+        self.job_lock = threading.Lock()
+        self.job_timeout = env_float("HUMANIZE_JOB_TIMEOUT", 90, minimum=1.0)
+        self.max_text_bytes = int(env_float("HUMANIZE_MAX_TEXT_KB", 512, minimum=1.0) * 1024)
         self.hotkey_listener = None
+        self.batch_panel = None
+        self.profiler = JobProfiler()
+        self.dispatcher = PriorityDispatcher.from_env()
         self.check_accessibility_permissions()
         self.setup_gui()
         self.setup_global_hotkey()
@@ -144,6 +219,17 @@ The app will continue running with limited functionality until permissions are g
                                      activeforeground='white')
         self.humanize_btn.pack(pady=15, fill='x')
         
+        # Cancel button, shown only while a job is running
+        self.cancel_btn = tk.Button(main_frame, text="✖ Cancel (Esc)",
+                                   command=self.cancel_current_job,
+                                   font=("SF Pro Display", 10),
+                                   bg='#374151', fg='white',
+                                   relief='flat', pady=4,
+                                   cursor='hand2',
+                                   activebackground='#4b5563',
+                                   activeforeground='white')
+        self.root.bind('<Escape>', lambda e: self.cancel_current_job())
+        
         # Info section
         info_frame = tk.Frame(main_frame, bg='#2b2f36')
         info_frame.pack(fill='x', pady=5)
@@ -172,6 +258,16 @@ The app will continue running with limited functionality until permissions are g
                                 activebackground='#dc2626')
         minimize_btn.pack(side='right', padx=(5, 0))
         
+        # Batch panel button
+        batch_btn = tk.Button(control_frame, text="📚",
+                             command=self.open_batch_panel,
+                             font=("SF Pro Display", 12),
+                             bg='#374151', fg='white',
+                             relief='flat', width=3, height=1,
+                             cursor='hand2',
+                             activebackground='#4b5563')
+        batch_btn.pack(side='right', padx=(5, 0))
+        
         # Always on top toggle
         self.topmost_var = tk.BooleanVar(value=True)
         topmost_btn = tk.Checkbutton(control_frame, text="Stay on top",
@@ -228,14 +324,18 @@ The app will continue running with limited functionality until permissions are g
         
     def setup_global_hotkey(self):
         """Setup global hotkey (Cmd+Shift+H)"""
+        if os.getenv("HUMANIZE_HOTKEY_IN_PROCESS") != "1":
+            self.setup_hotkey_process()
+            return
+        
         def on_hotkey():
-            if not self.is_processing:
-                self.root.after(0, self.humanize_selected_text)
+            # A press while busy supersedes the running job
+            self.root.after(0, self.humanize_selected_text)
         
         try:
             # Set up global hotkey listener
             self.hotkey_listener = keyboard.GlobalHotKeys({
-                '<cmd>+<shift>+h': on_hotkey
+                DEFAULT_COMBO: on_hotkey
             })
             
             # Start the listener
@@ -246,6 +346,26 @@ The app will continue running with limited functionality until permissions are g
             print(f"⚠️  Could not register global hotkey: {e}")
             self.update_status("Hotkey unavailable", "#ef4444")
         
+    def setup_hotkey_process(self):
+        """Run the global hotkey listener in its own process"""
+        def on_hotkey(event: dict):
+            # A press while busy supersedes the running job
+            self.root.after(0, lambda: self.humanize_selected_text(triggered_at=event["t"]))
+        
+        def on_error(message: str):
+            self.update_status("Hotkey unavailable", "#ef4444")
+        
+        def on_ready():
+            print("✅ Global hotkey (⌘⇧H) registered in listener process")
+        
+        # Starts in the background; the window does not wait for the child
+        self.hotkey_listener = HotkeyProcess(
+            on_hotkey,
+            source=os.getenv("HUMANIZE_HOTKEY_SOURCE", "pynput"),
+            on_error=on_error,
+            on_ready=on_ready)
+        self.hotkey_listener.start()
+        
     def minimize_app(self):
         """Minimize app to dock"""
         self.root.withdraw()
@@ -276,12 +396,37 @@ The app will continue running with limited functionality until permissions are g
         except:
             pass
     
+    def clipboard_change_count(self) -> Optional[int]:
+        """Pasteboard change counter, so a copy can be detected without reading it"""
+        try:
+            return AppKit.NSPasteboard.generalPasteboard().changeCount()
+        except Exception:
+            return None
+    
+    def read_clipboard(self) -> Optional[bytes]:
+        """Read the clipboard as raw bytes, stopping as soon as it exceeds the size limit"""
+        proc = subprocess.Popen(['pbpaste'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        data = proc.stdout.read(self.max_text_bytes + 1)
+        if len(data) > self.max_text_bytes:
+            proc.kill()
+            proc.wait()
+            raise SelectionTooLarge()
+        proc.stdout.close()
+        if proc.wait() != 0:
+            return None
+        return data
+    
     def get_selected_text(self) -> Optional[str]:
         """Get selected text from the currently active application"""
         try:
-            # Store current clipboard
-            original_clipboard = subprocess.run(['pbpaste'], 
-                                              capture_output=True, text=True).stdout
+            # Remember the clipboard state without keeping a copy of its contents
+            original_count = self.clipboard_change_count()
+            original_digest = None
+            if original_count is None:
+                try:
+                    original_digest = hash(self.read_clipboard())
+                except SelectionTooLarge:
+                    pass
             
             # Copy selected text
             script = '''
@@ -296,40 +441,57 @@ The app will continue running with limited functionality until permissions are g
             # Wait for clipboard to update
             time.sleep(0.3)
             
-            # Get new clipboard content
-            result = subprocess.run(['pbpaste'], 
-                                  capture_output=True, text=True)
+            # Nothing new was copied, so nothing was selected
+            if original_count is not None and self.clipboard_change_count() == original_count:
+                self.update_status("No text selected", "#ef4444", "🔴")
+                return None
             
-            if result.returncode == 0:
-                selected_text = result.stdout.strip()
-                
-                # Restore original clipboard if no new text was selected
-                if selected_text == original_clipboard:
-                    self.update_status("No text selected", "#ef4444", "🔴")
-                    return None
-                    
-                if selected_text and len(selected_text.split()) >= 5:
-                    return selected_text
-                else:
-                    self.update_status("Select more text (5+ words)", "#ef4444", "⚠️")
-                    return None
-            else:
+            # Get new clipboard content, refusing oversized selections up front
+            data = self.read_clipboard()
+            if data is None:
                 self.update_status("Failed to get text", "#ef4444", "❌")
                 return None
+            
+            if original_digest is not None and hash(data) == original_digest:
+                self.update_status("No text selected", "#ef4444", "🔴")
+                return None
+            
+            selected_text = data.decode('utf-8', errors='replace')
+            del data
+            # Only pay for a stripped copy when there is whitespace to strip
+            if selected_text[:1].isspace() or selected_text[-1:].isspace():
+                selected_text = selected_text.strip()
+            
+            if count_words(selected_text, stop_at=5) >= 5:
+                return selected_text
+            else:
+                self.update_status("Select more text (5+ words)", "#ef4444", "⚠️")
+                return None
                 
+        except SelectionTooLarge:
+            self.update_status(f"Selection too large (max {self.max_text_bytes // 1024} KB)",
+                               "#ef4444", "⚠️")
+            return None
         except Exception as e:
             self.update_status(f"Error: {str(e)[:20]}...", "#ef4444", "❌")
             return None
     
-    def set_selected_text(self, text: str) -> bool:
+    def set_selected_text(self, text: str, token: Optional[CancelToken] = None) -> bool:
         """Replace selected text with humanized version"""
         try:
+            if token is not None:
+                token.check()
+            
             # Set clipboard to new text
             subprocess.run(['pbcopy'], input=text, text=True, check=True)
             
             # Small delay to ensure clipboard is set
             time.sleep(0.1)
             
+            # Never paste for a job that was cancelled or superseded meanwhile
+            if token is not None:
+                token.check()
+            
             # Paste the new text
             script = '''
             tell application "System Events"
@@ -342,47 +504,79 @@ The app will continue running with limited functionality until permissions are g
             
             return result.returncode == 0
             
+        except JobCancelled:
+            raise
         except Exception as e:
             self.update_status(f"Paste error", "#ef4444", "❌")
             return False
     
-    def submit_humanization_task(self, text: str) -> Optional[str]:
-        """Submit text to Humanize AI API"""
+    def open_session(self, token: Optional[CancelToken]) -> requests.Session:
+        """HTTP session whose requests in flight are aborted when the job is cancelled"""
+        session = requests.Session()
+        adapter = AbortableAdapter()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if self.recorder is not None:
+            self.recorder.attach(session)
+        if token is not None:
+            token.add_callback(adapter.abort)
+            token.add_callback(session.close)
+        return session
+    
+    def request_timeout(self, token: Optional[CancelToken], limit: float) -> float:
+        """HTTP timeout bounded by the job's remaining time"""
+        return token.remaining(limit) if token is not None else limit
+    
+    def submit_humanization_task(self, body: bytes, priority: int = INTERACTIVE,
+                                 token: Optional[CancelToken] = None,
+                                 on_status: Optional[Callable] = None) -> Optional[str]:
+        """Submit an encoded request body to Humanize AI API"""
+        report = on_status or self.update_status
         try:
             headers = {
                 'x-api-key': self.api_key,
                 'Content-Type': 'application/json'
             }
             
-            data = {'text': text}
-            
-            response = requests.post(f"{self.api_base_url}/", 
-                                   headers=headers, 
-                                   json=data, 
-                                   timeout=30)
+            self.dispatcher.acquire_request(priority, token)
+            with self.open_session(token) as session:
+                response = session.post(f"{self.api_base_url}/", 
+                                        headers=headers, 
+                                        data=body, 
+                                        timeout=self.request_timeout(token, 30))
             
             if response.status_code == 200:
                 result = response.json()
                 return result.get('id')
             else:
-                self.update_status(f"API Error: {response.status_code}", "#ef4444", "❌")
+                report(f"API Error: {response.status_code}", "#ef4444", "❌")
                 return None
                 
+        except JobCancelled:
+            raise
         except Exception as e:
-            self.update_status(f"Network error", "#ef4444", "🌐")
+            # Errors from a session closed by cancellation are not network errors
+            if token is not None:
+                token.check()
+            report(f"Network error", "#ef4444", "🌐")
             return None
     
-    def get_humanization_result(self, task_id: str) -> Optional[Tuple[str, str]]:
+    def get_humanization_result(self, task_id: str, priority: int = INTERACTIVE,
+                                token: Optional[CancelToken] = None,
+                                on_status: Optional[Callable] = None) -> Optional[Tuple[str, str]]:
         """Get humanization result from API"""
+        report = on_status or self.update_status
+        session = self.open_session(token)
         try:
             headers = {'x-api-key': self.api_key}
             max_attempts = 30
             attempt = 0
             
             while attempt < max_attempts:
-                response = requests.get(f"{self.api_base_url}/?id={task_id}", 
-                                      headers=headers, 
-                                      timeout=15)
+                self.dispatcher.acquire_request(priority, token)
+                response = session.get(f"{self.api_base_url}/?id={task_id}", 
+                                       headers=headers, 
+                                       timeout=self.request_timeout(token, 15))
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -391,22 +585,31 @@ The app will continue running with limited functionality until permissions are g
                         return result.get('original_text'), result.get('humanized_text')
                     elif result.get('status') == 'processing':
                         progress_msg = f"Processing... {attempt + 1}/30"
-                        self.update_status(progress_msg, "#f59e0b", "⏳")
-                        time.sleep(2)
+                        report(progress_msg, "#f59e0b", "⏳")
+                        if token is not None:
+                            token.sleep(2)
+                        else:
+                            time.sleep(2)
                         attempt += 1
                     else:
-                        self.update_status("Task failed", "#ef4444", "❌")
+                        report("Task failed", "#ef4444", "❌")
                         return None
                 else:
-                    self.update_status(f"API Error: {response.status_code}", "#ef4444", "❌")
+                    report(f"API Error: {response.status_code}", "#ef4444", "❌")
                     return None
             
-            self.update_status("Timeout - try again", "#ef4444", "⏰")
+            report("Timeout - try again", "#ef4444", "⏰")
             return None
             
+        except JobCancelled:
+            raise
         except Exception as e:
-            self.update_status("Processing error", "#ef4444", "❌")
+            if token is not None:
+                token.check()
+            report("Processing error", "#ef4444", "❌")
             return None
+        finally:
+            session.close()
     
     def update_status(self, message: str, color: str = "#4ade80", indicator: str = "🟢"):
         """Update status label with indicator"""
@@ -427,10 +630,12 @@ The app will continue running with limited functionality until permissions are g
             
             if enabled:
                 self.progress.pack_forget()
+                self.cancel_btn.pack_forget()
                 self.humanize_btn.config(text="✨ Humanize Selected Text")
             else:
                 self.progress.pack(fill='x', pady=(5, 10), before=self.humanize_btn)
                 self.progress.start(10)
+                self.cancel_btn.pack(fill='x', pady=(0, 10), after=self.humanize_btn)
                 self.humanize_btn.config(text="🔄 Processing...")
         
         if threading.current_thread() is threading.main_thread():
@@ -438,46 +643,56 @@ The app will continue running with limited functionality until permissions are g
         else:
             self.root.after(0, toggle)
     
-    def humanize_selected_text(self):
+    def cancel_current_job(self, reason: str = "cancelled"):
+        """Cancel the job in flight, if any"""
+        if self.current_job is not None:
+            self.current_job.cancel(reason)
+    
+    def humanize_selected_text(self, triggered_at: Optional[float] = None):
         """Main function to humanize selected text"""
-        if self.is_processing:
+        # While the batch panel is collecting, the hotkey adds to the batch
+        if self.batch_panel is not None and self.batch_panel.is_collecting():
+            self.batch_panel.capture_selection()
             return
-            
+        
+        # Pressing again while busy means the user moved on to new text
+        token = CancelToken(self.job_timeout)
+        with self.job_lock:
+            previous, self.current_job = self.current_job, token
+        if previous is not None:
+            previous.cancel("superseded")
+        
         def process():
+            rss_before = peak_rss_bytes()
             try:
                 self.is_processing = True
                 self.toggle_ui_state(False)
                 self.update_status("Getting text...", "#3b82f6", "📋")
                 
+                if triggered_at is not None:
+                    print(f"⌨️  Trigger-to-capture: {(time.time() - triggered_at) * 1000:.1f} ms")
+                
                 # Get selected text
                 selected_text = self.get_selected_text()
+                token.check()
                 if not selected_text:
                     return
                 
-                # Check word count
-                word_count = len(selected_text.split())
-                if word_count < 5:
-                    self.update_status(f"Need 5+ words (got {word_count})", "#ef4444", "⚠️")
-                    return
-                
-                self.update_status(f"Humanizing {word_count} words...", "#3b82f6", "🤖")
-                
-                # Submit to API
-                task_id = self.submit_humanization_task(selected_text)
-                if not task_id:
-                    return
+                # Only the prepared lines are needed from here on
+                prepared = prepare_payload(selected_text)
+                del selected_text
+                word_count = prepared.original_words
                 
-                # Get result
-                result = self.get_humanization_result(task_id)
-                if not result:
+                # Interactive presses go ahead of any queued background work
+                humanized_text = self.humanize_prepared(prepared, INTERACTIVE, token,
+                                                        self.update_status)
+                if humanized_text is None:
                     return
                 
-                original_text, humanized_text = result
-                
                 self.update_status("Replacing text...", "#3b82f6", "📝")
                 
                 # Replace text
-                if self.set_selected_text(humanized_text):
+                if self.set_selected_text(humanized_text, token):
                     self.update_status("✅ Humanized & Pasted!", "#4ade80", "✅")
                     self.show_notification("Humanize AI", 
                                          f"Text successfully humanized! ({word_count} words)")
@@ -488,18 +703,128 @@ The app will continue running with limited functionality until permissions are g
                 else:
                     self.update_status("Replace failed", "#ef4444", "❌")
                 
+            except JobCancelled as e:
+                print(f"🛑 Job stopped: {e}")
+                # A superseding job owns the status line now
+                if token.reason == "deadline":
+                    self.update_status("Timed out - try again", "#ef4444", "⏰")
+                elif token.reason != "superseded":
+                    self.update_status("Cancelled", "#f59e0b", "✖")
             except Exception as e:
                 self.update_status("Error occurred", "#ef4444", "❌")
                 print(f"Processing error: {e}")
             finally:
-                self.is_processing = False
-                self.toggle_ui_state(True)
-                # Reset status after 5 seconds
-                self.root.after(5000, lambda: self.update_status(
-                    "Ready • Press ⌘⇧H", "#4ade80", "🟢"))
+                print(f"⏱️  Queue wait: {self.dispatcher.format_wait_stats()}")
+                self.report_peak_rss("Job", rss_before)
+                with self.job_lock:
+                    still_current = self.current_job is token
+                    if still_current:
+                        self.current_job = None
+                if still_current:
+                    self.is_processing = False
+                    self.toggle_ui_state(True)
+                    # Reset status after 5 seconds
+                    self.root.after(5000, lambda: self.is_processing or self.update_status(
+                        "Ready • Press ⌘⇧H", "#4ade80", "🟢"))
+        
+        def profiled_process():
+            with self.profiler.job("humanize"):
+                process()
         
         # Run in background thread
-        threading.Thread(target=process, daemon=True).start()
+        threading.Thread(target=profiled_process, daemon=True).start()
+    
+    def report_peak_rss(self, label: str, rss_before: int):
+        """Print the process's peak RSS and how much a job raised it"""
+        peak = peak_rss_bytes()
+        print(f"🧠 {label} peak RSS {peak / (1024 * 1024):.1f} MB "
+              f"(+{(peak - rss_before) / (1024 * 1024):.1f} MB during job)")
+    
+    def humanize_text(self, text: str, priority: int, token: CancelToken,
+                      on_status: Callable, timeout: Optional[float] = None) -> Optional[str]:
+        """Humanize one piece of text end to end without touching the selection"""
+        # Drop whitespace, repeats and non-prose before billing
+        return self.humanize_prepared(prepare_payload(text), priority, token, on_status, timeout)
+    
+    def humanize_prepared(self, prepared: PreparedPayload, priority: int, token: CancelToken,
+                          on_status: Callable, timeout: Optional[float] = None) -> Optional[str]:
+        """Humanize text already split by prepare_payload
+        
+        ``timeout`` starts the token's deadline once a slot is held, so time
+        spent queued behind other jobs does not count against it.
+        """
+        if prepared.original_words < 5:
+            on_status(f"Need 5+ words (got {prepared.original_words})", "#ef4444", "⚠️")
+            return None
+        
+        on_status("Waiting for a slot...", "#9ca3af", "⏳")
+        with self.dispatcher.slot(priority, token):
+            if timeout is not None:
+                token.set_deadline(timeout)
+            
+            # Too little prose survives reduction (e.g. short greetings)
+            if prepared.payload_words < 5:
+                print(f"📨 Sending the whole text ({prepared.original_words} words billed)")
+                on_status(f"Humanizing {prepared.original_words} words...", "#3b82f6", "🤖")
+                return self.submit_and_wait(prepared.full_body(), priority, token, on_status)
+            
+            on_status(f"Humanizing {prepared.payload_words} words...", "#3b82f6", "🤖")
+            humanized = self.submit_and_wait(prepared.request_body(), priority, token, on_status)
+            if humanized is None:
+                return None
+            rebuilt = prepared.rebuild(humanized)
+            if rebuilt is not None:
+                if prepared.saved_words:
+                    print(f"✂️  Payload reduced by {prepared.saved_words} of "
+                          f"{prepared.original_words} words")
+                return rebuilt
+            
+            # The reply's lines don't match what was sent, so the reduced
+            # pieces can't be put back safely; humanize the whole text instead
+            billed = prepared.payload_words + prepared.original_words
+            print(f"↩️  Humanized lines did not match the payload; resending the whole text "
+                  f"({billed} words billed in total)")
+            on_status(f"Resending {prepared.original_words} words...", "#f59e0b", "↩️")
+            return self.submit_and_wait(prepared.full_body(), priority, token, on_status)
+    
+    def submit_and_wait(self, body: bytes, priority: int, token: CancelToken,
+                        on_status: Callable) -> Optional[str]:
+        """Submit one request body and poll until its humanized version is ready"""
+        task_id = self.submit_humanization_task(body, priority, token, on_status)
+        if not task_id:
+            return None
+        
+        result = self.get_humanization_result(task_id, priority, token, on_status)
+        if not result:
+            return None
+        return result[1]
+    
+    def get_frontmost_app(self) -> Optional[str]:
+        """Name of the application that currently has focus"""
+        try:
+            script = 'tell application "System Events" to get name of first application process whose frontmost is true'
+            result = subprocess.run(['osascript', '-e', script],
+                                  capture_output=True, text=True, timeout=5)
+            if result.returncode != 0:
+                return None
+            return result.stdout.strip() or None
+        except Exception:
+            return None
+    
+    def activate_app(self, app_name: str):
+        """Bring an application back to the front before pasting into it"""
+        try:
+            subprocess.run(['osascript', '-e', f'tell application "{app_name}" to activate'],
+                          capture_output=True, timeout=5)
+            time.sleep(0.3)
+        except Exception:
+            pass
+    
+    def open_batch_panel(self):
+        """Show the multi-selection batch panel"""
+        if self.batch_panel is None:
+            self.batch_panel = BatchPanel(self)
+        self.batch_panel.show()
     
     def run(self):
         """Start the floating app"""
@@ -512,16 +837,337 @@ The app will continue running with limited functionality until permissions are g
             print("   • Press ⌘⇧H anywhere to humanize selected text")
             print("   • The app floats on all desktops and stays on top")
             print("   • Click minimize (-) to hide to dock")
+            if self.profiler.enabled:
+                print(f"   • Profiling slow jobs to {self.profiler.profile_dir}")
             
+            self.profiler.watch_mainloop(self.root)
             self.root.mainloop()
         except KeyboardInterrupt:
             if self.hotkey_listener:
                 self.hotkey_listener.stop()
             self.root.quit()
         finally:
+            self.cancel_current_job("quit")
+            if self.batch_panel is not None:
+                self.batch_panel.cancel_all()
+            self.profiler.stop()
             if self.hotkey_listener:
                 self.hotkey_listener.stop()
 
+class BatchItem:
+    """One captured selection or pasted section in the batch panel"""
+    
+    def __init__(self, text: str, source_app: Optional[str] = None):
+        self.text = text
+        self.source_app = source_app
+        self.word_count = count_words(text)
+        self.status = "Queued"
+        self.result: Optional[str] = None
+        self.token: Optional[CancelToken] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+    
+    @property
+    def running(self) -> bool:
+        return self.started is not None and self.finished is None
+    
+    @property
+    def elapsed(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        return (self.finished or time.monotonic()) - self.started
+
+class BatchPanel:
+    """Collects several selections and humanizes them concurrently"""
+    
+    def __init__(self, app: FloatingHumanizeApp):
+        self.app = app
+        self.items: List[BatchItem] = []
+        self.batch_started: Optional[float] = None
+        
+        self.window = tk.Toplevel(app.root)
+        self.window.title("Humanize AI - Batch")
+        self.window.geometry("460x460")
+        self.window.attributes('-topmost', True)
+        self.window.configure(bg='#1e2329')
+        self.window.protocol("WM_DELETE_WINDOW", self.window.withdraw)
+        
+        frame = tk.Frame(self.window, bg='#2b2f36', padx=12, pady=12)
+        frame.pack(fill='both', expand=True, padx=8, pady=8)
+        
+        title_label = tk.Label(frame, text="📚 Batch", 
+                              font=("SF Pro Display", 14, "bold"),
+                              bg='#2b2f36', fg='#ffffff')
+        title_label.pack(anchor='w')
+        
+        # Collect mode: ⌘⇧H adds the selection here instead of humanizing it
+        self.collect_var = tk.BooleanVar(value=True)
+        collect_btn = tk.Checkbutton(frame, text="Collect selections with ⌘⇧H",
+                                    variable=self.collect_var,
+                                    font=("SF Pro Display", 10),
+                                    bg='#2b2f36', fg='#9ca3af',
+                                    selectcolor='#2b2f36',
+                                    activebackground='#2b2f36',
+                                    activeforeground='#9ca3af')
+        collect_btn.pack(anchor='w', pady=(4, 4))
+        
+        # Item list with live per-item progress
+        self.tree = ttk.Treeview(frame, columns=("words", "status", "time"),
+                                 height=8, selectmode='extended')
+        self.tree.heading("#0", text="Text")
+        self.tree.heading("words", text="Words")
+        self.tree.heading("status", text="Status")
+        self.tree.heading("time", text="Time")
+        self.tree.column("#0", width=150)
+        self.tree.column("words", width=50, anchor='e')
+        self.tree.column("status", width=140)
+        self.tree.column("time", width=50, anchor='e')
+        self.tree.pack(fill='both', expand=True, pady=(0, 6))
+        
+        # Pasted multi-section text, split on blank lines
+        self.paste_box = tk.Text(frame, height=4, font=("SF Pro Display", 10),
+                                bg='#1e2329', fg='#ffffff', insertbackground='#ffffff',
+                                relief='flat', wrap='word')
+        self.paste_box.pack(fill='x', pady=(0, 6))
+        
+        rows = [
+            [("➕ Add Pasted Sections", self.add_pasted_sections),
+             ("🗑 Remove", self.remove_selected),
+             ("Clear", self.clear)],
+            [("✨ Humanize All", self.humanize_all),
+             ("✖ Cancel All", self.cancel_all)],
+            [("Copy", self.copy_selected),
+             ("Paste", self.paste_selected),
+             ("Copy All", self.copy_all),
+             ("Paste All", self.paste_all)],
+        ]
+        for row in rows:
+            row_frame = tk.Frame(frame, bg='#2b2f36')
+            row_frame.pack(fill='x', pady=2)
+            for text, command in row:
+                tk.Button(row_frame, text=text, command=command,
+                         font=("SF Pro Display", 10),
+                         bg='#3b82f6', fg='white',
+                         relief='flat', pady=4,
+                         cursor='hand2',
+                         activebackground='#2563eb',
+                         activeforeground='white').pack(side='left', fill='x',
+                                                       expand=True, padx=2)
+        
+        self.summary_label = tk.Label(frame, text="No items yet", 
+                                     font=("SF Pro Display", 10),
+                                     bg='#2b2f36', fg='#9ca3af')
+        self.summary_label.pack(anchor='w', pady=(6, 0))
+    
+    def show(self):
+        """Bring the panel to the front"""
+        self.window.deiconify()
+        self.window.lift()
+    
+    def is_collecting(self) -> bool:
+        """Whether the hotkey should add to the batch"""
+        try:
+            return self.collect_var.get() and bool(self.window.winfo_viewable())
+        except tk.TclError:
+            return False
+    
+    def run_on_ui(self, callback: Callable):
+        """Run a callback on the Tk thread"""
+        if threading.current_thread() is threading.main_thread():
+            callback()
+        else:
+            self.app.root.after(0, callback)
+    
+    def add_item(self, item: BatchItem):
+        """Append an item to the list"""
+        self.items.append(item)
+        preview = first_words(item.text, 8)
+        self.tree.insert('', 'end', iid=str(id(item)), text=preview,
+                         values=(item.word_count, item.status, ""))
+        self.refresh_summary()
+    
+    def capture_selection(self):
+        """Copy the selection in the front app and add it to the batch"""
+        def capture():
+            source_app = self.app.get_frontmost_app()
+            text = self.app.get_selected_text()
+            if text:
+                self.run_on_ui(lambda: self.add_item(BatchItem(text, source_app)))
+                self.app.update_status("Added to batch", "#4ade80", "📚")
+        
+        threading.Thread(target=capture, daemon=True).start()
+    
+    def add_pasted_sections(self):
+        """Split the pasted text on blank lines and add each section"""
+        text = self.paste_box.get("1.0", "end").strip()
+        if not text:
+            return
+        if len(text.encode('utf-8')) > self.app.max_text_bytes:
+            self.summary_label.config(
+                text=f"Text too large (max {self.app.max_text_bytes // 1024} KB)")
+            return
+        for section in re.split(r'\n\s*\n', text):
+            if section.strip():
+                self.add_item(BatchItem(section.strip()))
+        self.paste_box.delete("1.0", "end")
+    
+    def selected_items(self) -> List[BatchItem]:
+        """Items highlighted in the list, in list order"""
+        selected = set(self.tree.selection())
+        return [item for item in self.items if str(id(item)) in selected]
+    
+    def remove_selected(self):
+        """Drop the highlighted items, cancelling any still running"""
+        for item in self.selected_items():
+            if item.token is not None:
+                item.token.cancel()
+            self.items.remove(item)
+            self.tree.delete(str(id(item)))
+        self.refresh_summary()
+    
+    def clear(self):
+        """Drop every item"""
+        self.cancel_all()
+        self.items = []
+        self.tree.delete(*self.tree.get_children())
+        self.batch_started = None
+        self.refresh_summary()
+    
+    def set_item_status(self, item: BatchItem, message: str):
+        """Record an item's progress and refresh its row"""
+        item.status = message
+        
+        def update():
+            iid = str(id(item))
+            if self.tree.exists(iid):
+                elapsed = f"{item.elapsed:.1f}s" if item.elapsed is not None else ""
+                self.tree.item(iid, values=(item.word_count, message, elapsed))
+            self.refresh_summary()
+        
+        self.run_on_ui(update)
+    
+    def humanize_all(self):
+        """Start every queued or failed item at once"""
+        pending = [item for item in self.items if item.result is None and not item.running]
+        if not pending:
+            return
+        self.batch_started = time.monotonic()
+        for item in pending:
+            # The deadline starts once the item gets a slot, not while queued
+            item.token = CancelToken()
+            item.started = time.monotonic()
+            item.finished = None
+            threading.Thread(target=self.process_item, args=(item,), daemon=True).start()
+        self.refresh_summary()
+    
+    def process_item(self, item: BatchItem):
+        """Worker for one item; the dispatcher bounds how many run at once"""
+        def on_status(message: str, color: str = "#4ade80", indicator: str = ""):
+            self.set_item_status(item, f"{indicator} {message}".strip())
+        
+        rss_before = peak_rss_bytes()
+        try:
+            with self.app.profiler.job("batch-item"):
+                result = self.app.humanize_text(item.text, BACKGROUND, item.token, on_status,
+                                                timeout=self.app.job_timeout)
+            item.finished = time.monotonic()
+            if result is not None:
+                item.result = result
+                on_status("Done", indicator="✅")
+        except JobCancelled:
+            item.finished = time.monotonic()
+            if item.token.reason == "deadline":
+                on_status("Timed out", indicator="⏰")
+            else:
+                on_status("Cancelled", indicator="✖")
+        except Exception as e:
+            item.finished = time.monotonic()
+            on_status("Error", indicator="❌")
+            print(f"Batch item error: {e}")
+        finally:
+            self.app.report_peak_rss("Batch item", rss_before)
+    
+    def cancel_all(self):
+        """Cancel every running item"""
+        for item in self.items:
+            if item.token is not None and item.running:
+                item.token.cancel()
+    
+    def refresh_summary(self):
+        """Show overall progress, wall time and the slowest item"""
+        done = sum(1 for item in self.items if item.result is not None)
+        running = sum(1 for item in self.items if item.running)
+        summary = f"{done}/{len(self.items)} done"
+        if running:
+            summary += f" • {running} running"
+        if self.batch_started is not None:
+            timed = [item.elapsed for item in self.items if item.elapsed is not None]
+            if timed:
+                end = time.monotonic() if running else max(
+                    item.finished for item in self.items if item.finished is not None)
+                summary += (f" • {end - self.batch_started:.1f}s wall"
+                            f" (slowest item {max(timed):.1f}s)")
+        self.summary_label.config(text=summary)
+    
+    def results_for(self, items: List[BatchItem]) -> List[BatchItem]:
+        """The subset of items that have a humanized result"""
+        return [item for item in items if item.result is not None]
+    
+    def copy_selected(self):
+        """Copy the highlighted results to the clipboard"""
+        self.copy_items(self.results_for(self.selected_items()))
+    
+    def copy_all(self):
+        """Copy every result to the clipboard, in list order"""
+        self.copy_items(self.results_for(self.items))
+    
+    def copy_items(self, items: List[BatchItem]):
+        if not items:
+            return
+        text = "\n\n".join(item.result for item in items)
+        subprocess.run(['pbcopy'], input=text, text=True, check=False)
+        self.summary_label.config(text=f"Copied {len(items)} result(s)")
+    
+    def paste_selected(self):
+        """Paste each highlighted result back into the app it came from"""
+        self.paste_items(self.results_for(self.selected_items()))
+    
+    def paste_all(self):
+        """Paste every result, joined, into the app of the last capture"""
+        items = self.results_for(self.items)
+        if items:
+            self.paste_items(items, combined=True)
+    
+    def paste_items(self, items: List[BatchItem], combined: bool = False):
+        """Activate the source app and paste; the Tk thread never blocks on it"""
+        if not items:
+            return
+        fallback_app = next((item.source_app for item in reversed(self.items)
+                             if item.source_app), None)
+        
+        def paste():
+            if combined:
+                batches = [(fallback_app, "\n\n".join(item.result for item in items))]
+            else:
+                # Results bound for the same app land at the same cursor, so
+                # consecutive ones are joined with a blank line, not run together
+                batches = []
+                for item in items:
+                    source_app = item.source_app or fallback_app
+                    if batches and batches[-1][0] == source_app:
+                        batches[-1] = (source_app, batches[-1][1] + "\n\n" + item.result)
+                    else:
+                        batches.append((source_app, item.result))
+            for source_app, text in batches:
+                if not source_app:
+                    self.run_on_ui(lambda: self.summary_label.config(
+                        text="No source app - use Copy instead"))
+                    return
+                self.app.activate_app(source_app)
+                self.app.set_selected_text(text)
+        
+        threading.Thread(target=paste, daemon=True).start()
+
 def main():
     """Main entry point"""
     print("🚀 Starting Floating Humanize AI Text Processor...")
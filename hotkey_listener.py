@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Process-isolated global hotkey listener for Humanize AI
+The key listener runs in its own small process and reports timestamped
+events to the app over a pipe, so a busy Tk process or worker thread
+cannot delay key handling. The app side restarts the listener if it dies
+
+Child:      python3 hotkey_listener.py --combo '<cmd>+<shift>+h'
+Linux test: python3 hotkey_listener.py --supervise --source interval:0.5 --exit-after 3 --restarts 2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, List, Optional
+
+DEFAULT_COMBO = '<cmd>+<shift>+h'
+
+
+def emit(event: str, **fields):
+    """Write one event line to the parent; ``t`` is the wall-clock send time"""
+    fields.update(event=event, t=time.time())
+    sys.stdout.write(json.dumps(fields) + "\n")
+    sys.stdout.flush()
+
+
+def watch_parent():
+    """Exit as soon as the app goes away
+
+    The app holds the write end of our stdin; it is closed when the app exits
+    or crashes, even if its own cleanup never runs (e.g. Tk's Cmd+Q), so EOF
+    on stdin means no one is listening and the keyboard hook must go.
+    """
+    def wait_for_eof():
+        while sys.stdin.readline():
+            pass
+        os._exit(0)
+
+    threading.Thread(target=wait_for_eof, daemon=True).start()
+
+
+def run_listener(combo: str, source: str, exit_after: int = 0):
+    """Child side: listen for the hotkey and report each press"""
+    count = 0
+    if source != "stdin":
+        watch_parent()
+
+    def on_hotkey():
+        nonlocal count
+        emit("hotkey", combo=combo)
+        count += 1
+        if exit_after and count >= exit_after:
+            # Simulated crash for exercising the supervisor's restart path
+            os._exit(3)
+
+    if source == "pynput":
+        try:
+            from pynput import keyboard
+            listener = keyboard.GlobalHotKeys({combo: on_hotkey})
+            listener.start()
+        except Exception as e:
+            emit("error", message=str(e))
+            sys.exit(2)
+        emit("ready", pid=os.getpid(), source=source)
+        listener.join()
+
+    elif source == "stdin":
+        # Synthetic source: every line written to stdin is one press
+        emit("ready", pid=os.getpid(), source=source)
+        for _ in sys.stdin:
+            on_hotkey()
+
+    elif source.startswith("interval:"):
+        # Synthetic source: a press every N seconds
+        interval = float(source.split(":", 1)[1])
+        emit("ready", pid=os.getpid(), source=source)
+        while True:
+            time.sleep(interval)
+            on_hotkey()
+
+    else:
+        emit("error", message=f"Unknown event source: {source}")
+        sys.exit(2)
+
+
+class HotkeyProcess:
+    """App side: runs the listener process and relays its hotkey events
+
+    ``on_hotkey`` is called on a reader thread with the event dict, which
+    carries the child's send time ``t`` and the parent's receive time
+    ``received``. The child is restarted with exponential backoff whenever
+    it exits. An exit within a few seconds of starting counts as a failure
+    unless the child had reported ready; after ``max_failures`` failures in a
+    row the supervisor gives up and calls ``on_error``. ``on_ready`` is called
+    each time a listener process reports ready.
+    """
+
+    def __init__(self, on_hotkey: Callable[[dict], None], combo: str = DEFAULT_COMBO,
+                 source: str = "pynput", on_error: Optional[Callable[[str], None]] = None,
+                 on_ready: Optional[Callable[[], None]] = None,
+                 extra_args: Optional[List[str]] = None, max_failures: int = 5):
+        self.on_hotkey = on_hotkey
+        self.on_error = on_error
+        self.on_ready = on_ready
+        self.combo = combo
+        self.source = source
+        self.extra_args = extra_args or []
+        self.max_failures = max_failures
+        self.restarts = 0
+        self.last_error = ""
+        self._proc: Optional[subprocess.Popen] = None
+        self._stopping = threading.Event()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, wait: float = 0.0) -> bool:
+        """Start supervising; returns whether the listener reported ready within ``wait``
+
+        The default does not block, so the Tk thread never waits on the child.
+        """
+        self._thread = threading.Thread(target=self._supervise, daemon=True)
+        self._thread.start()
+        return self._ready.wait(wait) if wait else self._ready.is_set()
+
+    def stop(self):
+        """Stop the listener process and do not restart it"""
+        self._stopping.set()
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    def _spawn(self) -> subprocess.Popen:
+        command = [sys.executable, "-u", os.path.abspath(__file__),
+                   "--combo", self.combo, "--source", self.source] + self.extra_args
+        return subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                text=True, bufsize=1)
+
+    def _supervise(self):
+        backoff = 0.5
+        failures = 0
+
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            self._proc = self._spawn()
+            became_ready = self._relay(self._proc)
+            self._proc.wait()
+            if self._stopping.is_set():
+                break
+
+            # A child that got as far as listening was working; only quick
+            # exits before ready count towards giving up
+            if became_ready:
+                failures = 0
+            elif time.monotonic() - started < 5.0:
+                failures += 1
+            if time.monotonic() - started >= 5.0:
+                backoff = 0.5
+            if failures >= self.max_failures:
+                message = self.last_error or f"listener exited {failures} times"
+                print(f"⚠️  Hotkey listener gave up: {message}")
+                if self.on_error:
+                    self.on_error(message)
+                break
+
+            self.restarts += 1
+            print(f"🔁 Hotkey listener exited ({self._proc.returncode}), "
+                  f"restarting in {backoff:.1f}s")
+            if self._stopping.wait(backoff):
+                break
+            backoff = min(backoff * 2, 10.0)
+
+    def _relay(self, proc: subprocess.Popen) -> bool:
+        """Forward events from one listener process until its pipe closes
+
+        Returns whether the process reported ready.
+        """
+        became_ready = False
+        for line in proc.stdout:
+            received = time.time()
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+
+            kind = event.get("event")
+            if kind == "ready":
+                became_ready = True
+                self._ready.set()
+                if self.on_ready:
+                    self.on_ready()
+            elif kind == "error":
+                self.last_error = event.get("message", "")
+            elif kind == "hotkey":
+                event["received"] = received
+                try:
+                    self.on_hotkey(event)
+                except Exception as e:
+                    print(f"Hotkey handler error: {e}")
+        return became_ready
+
+    def press(self):
+        """Send one synthetic press to a listener started with source='stdin'"""
+        proc = self._proc
+        if proc is not None and proc.stdin is not None:
+            proc.stdin.write("\n")
+            proc.stdin.flush()
+
+
+def supervise_demo(args):
+    """Run the supervisor in the foreground and print pipe latencies
+
+    With ``--restarts N`` the demo ends once the Nth restarted listener has
+    exited too, so the synthetic crash path runs as a check that finishes.
+    """
+    def on_hotkey(event):
+        latency_ms = (event["received"] - event["t"]) * 1000
+        print(f"⌨️  {event['combo']} pipe latency {latency_ms:.2f} ms")
+
+    extra = ["--exit-after", str(args.exit_after)] if args.exit_after else []
+    listener = HotkeyProcess(on_hotkey, combo=args.combo, source=args.source, extra_args=extra,
+                             max_failures=args.max_failures)
+    if not listener.start(wait=5.0):
+        print("⚠️  Listener did not report ready")
+    try:
+        while listener._thread.is_alive():
+            listener._thread.join(0.1)
+            if args.restarts and listener.restarts > args.restarts:
+                print(f"✅ Listener restarted {args.restarts} time(s) and kept delivering presses")
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Humanize AI global hotkey listener")
+    parser.add_argument("--combo", default=DEFAULT_COMBO)
+    parser.add_argument("--source", default="pynput",
+                        help="pynput, stdin, or interval:SECONDS for synthetic presses")
+    parser.add_argument("--exit-after", type=int, default=0,
+                        help="exit after N presses (simulates a crash)")
+    parser.add_argument("--max-failures", type=int, default=5,
+                        help="with --supervise, quick exits before ready tolerated in a row")
+    parser.add_argument("--restarts", type=int, default=0,
+                        help="with --supervise, stop once the Nth restarted listener has exited")
+    parser.add_argument("--supervise", action="store_true",
+                        help="run the app-side supervisor and print latencies")
+    args = parser.parse_args()
+
+    if args.supervise:
+        supervise_demo(args)
+    else:
+        run_listener(args.combo, args.source, args.exit_after)
+
+
+if __name__ == "__main__":
+    main()
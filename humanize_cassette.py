@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Record/replay harness for the Humanize AI API
+Records real request/response sequences (with keys redacted) into cassette
+files, and replays them from a local HTTP server with the original or scaled
+timing so polling, pooling and concurrency changes can be benchmarked offline
+
+Record:  HUMANIZE_RECORD=session.json ./run_floating.sh
+Replay:  python3 humanize_cassette.py serve session.json --scale 0.1
+         HUMANIZE_API_BASE_URL=http://127.0.0.1:8765/v1 ./run_floating.sh
+Inspect: python3 humanize_cassette.py summary session.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit, urlunsplit
+
+CASSETTE_VERSION = 1
+REDACTED = "REDACTED"
+SECRET_NAMES = ("key", "token", "secret", "authorization", "password")
+
+
+def _is_secret(name: str) -> bool:
+    """Whether a header, query or JSON field name looks like a credential"""
+    name = name.lower()
+    return any(secret in name for secret in SECRET_NAMES)
+
+
+def redact(value):
+    """Copy of a JSON value with credential-like fields blanked out"""
+    if isinstance(value, dict):
+        return {k: REDACTED if _is_secret(k) else redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+def redact_url(url: str) -> str:
+    """URL with credential-like query parameters blanked out"""
+    parts = urlsplit(url)
+    query = [(k, REDACTED if _is_secret(k) else v) for k, v in parse_qsl(parts.query)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _json_or_text(raw) -> object:
+    """Decode a request/response body, keeping non-JSON bodies as text"""
+    if raw is None:
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", errors="replace")
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+class CassetteRecorder:
+    """Appends every API exchange made through attached sessions to a cassette
+
+    ``at`` is when the request was sent, in seconds since recording started,
+    and ``latency`` is how long the server took to answer; together they keep
+    the timing of ``status: processing`` rounds.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.monotonic()
+        self.interactions: List[dict] = []
+        self._lock = threading.Lock()
+
+    def attach(self, session):
+        """Record every response received through a requests session"""
+        session.hooks.setdefault("response", []).append(self._on_response)
+        return session
+
+    def _on_response(self, response, *args, **kwargs):
+        latency = response.elapsed.total_seconds()
+        request = response.request
+        headers = {k: REDACTED if _is_secret(k) else v for k, v in request.headers.items()}
+        interaction = {
+            "at": round(time.monotonic() - self.started - latency, 4),
+            "latency": round(latency, 4),
+            "method": request.method,
+            "url": redact_url(request.url),
+            "request": {"headers": headers, "body": redact(_json_or_text(request.body))},
+            "status": response.status_code,
+            "response": redact(_json_or_text(response.content)),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+            self._save()
+        return response
+
+    def _save(self):
+        """Rewrite the cassette so it is complete even if the app is killed"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CASSETTE_VERSION, "interactions": self.interactions},
+                      f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class RecordedTask:
+    """Timing shape of one recorded task: submit, processing rounds, result"""
+
+    def __init__(self, submit: dict, polls: List[dict]):
+        self.submit = submit
+        self.polls = polls
+        submitted = submit["at"] + submit["latency"]
+
+        done = [p for p in polls if not _is_processing(p)]
+        pending = [p for p in polls if _is_processing(p)]
+        self.final = done[0] if done else None
+        self.processing = pending[0]["response"] if pending else {"status": "processing"}
+
+        # The server became ready between the last processing poll and the
+        # first completed one; the midpoint keeps the old poll interval from
+        # leaking into replays of a different polling strategy.
+        if self.final is None:
+            self.ready_after = float("inf")
+        else:
+            last_pending = max((p["at"] for p in pending if p["at"] < self.final["at"]),
+                               default=submitted)
+            self.ready_after = max(0.0, (last_pending + self.final["at"]) / 2 - submitted)
+
+        latencies = [p["latency"] for p in polls] or [0.0]
+        self.poll_latency = sum(latencies) / len(latencies)
+
+
+def _is_processing(interaction: dict) -> bool:
+    body = interaction.get("response")
+    return isinstance(body, dict) and body.get("status") == "processing"
+
+
+def load_tasks(path: str) -> List[RecordedTask]:
+    """Group a cassette's interactions into recorded tasks, in submit order"""
+    with open(path) as f:
+        cassette = json.load(f)
+
+    submits = [i for i in cassette["interactions"] if i["method"] == "POST"]
+    polls: Dict[str, List[dict]] = {}
+    for interaction in cassette["interactions"]:
+        if interaction["method"] == "GET":
+            task_id = parse_qs(urlsplit(interaction["url"]).query).get("id", [""])[0]
+            polls.setdefault(task_id, []).append(interaction)
+
+    tasks = []
+    for submit in submits:
+        body = submit.get("response")
+        task_id = body.get("id") if isinstance(body, dict) else None
+        tasks.append(RecordedTask(submit, polls.get(task_id, [])))
+    return tasks
+
+
+class ReplayServer:
+    """Serves recorded tasks over local HTTP with original or scaled timing
+
+    Each POST replays the next recorded submit (cycling through the cassette)
+    under a fresh task id, so many concurrent jobs can share one recording.
+    GETs answer with the recorded processing body until the task's recorded
+    ready time has passed since its submit, then with the recorded result.
+    ``scale`` multiplies every delay: 0.1 replays ten times faster.
+    """
+
+    def __init__(self, path: str, scale: float = 1.0, host: str = "127.0.0.1", port: int = 8765):
+        self.tasks = load_tasks(path)
+        if not self.tasks:
+            raise ValueError(f"No recorded submits in {path}")
+        self.scale = scale
+        self._next_task = itertools.cycle(self.tasks)
+        self._live: Dict[str, tuple] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, body = server.submit()
+                self._reply(status, body)
+
+            def do_GET(self):
+                task_id = parse_qs(urlsplit(self.path).query).get("id", [""])[0]
+                status, body = server.poll(task_id)
+                self._reply(status, body)
+
+            def _reply(self, status: int, body):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def submit(self):
+        """Replay the next recorded submit under a new task id"""
+        with self._lock:
+            task = next(self._next_task)
+            replay_id = f"replay-{next(self._ids)}"
+        time.sleep(task.submit["latency"] * self.scale)
+
+        body = task.submit["response"]
+        if task.submit["status"] == 200 and isinstance(body, dict):
+            body = dict(body, id=replay_id)
+            with self._lock:
+                self._live[replay_id] = (task, time.monotonic())
+        return task.submit["status"], body
+
+    def poll(self, task_id: str):
+        """Answer a poll according to the task's recorded ready time"""
+        with self._lock:
+            live = self._live.get(task_id)
+        if live is None:
+            return 404, {"error": "Unknown task id"}
+
+        task, submitted = live
+        time.sleep(task.poll_latency * self.scale)
+        if task.final is None or time.monotonic() - submitted < task.ready_after * self.scale:
+            return 200, task.processing
+        return task.final["status"], task.final["response"]
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def start(self) -> "ReplayServer":
+        """Serve from a background thread, e.g. inside a benchmark"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def summarize(path: str):
+    """Print the timing shape of every task in a cassette"""
+    for n, task in enumerate(load_tasks(path), 1):
+        rounds = sum(1 for p in task.polls if _is_processing(p))
+        ready = "never" if task.final is None else f"{task.ready_after:.1f}s"
+        print(f"task {n}: submit {task.submit['latency'] * 1000:.0f}ms, "
+              f"{rounds} processing round(s), ready after {ready}, "
+              f"poll latency {task.poll_latency * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Humanize AI cassette tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="replay a cassette from a local server")
+    serve.add_argument("cassette")
+    serve.add_argument("--scale", type=float, default=1.0,
+                       help="timing scale (0.1 = ten times faster)")
+    serve.add_argument("--port", type=int, default=8765)
+
+    summary = commands.add_parser("summary", help="show the timing shape of a cassette")
+    summary.add_argument("cassette")
+
+    args = parser.parse_args()
+    if args.command == "summary":
+        summarize(args.cassette)
+        return
+
+    server = ReplayServer(args.cassette, scale=args.scale, port=args.port)
+    print(f"🎞️  Replaying {len(server.tasks)} task(s) at {server.base_url} (timing x{args.scale})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -71,6 +71,9 @@ sudo chmod +x "$MACOS_DIR/HumanizeAI"
 # Copy Python script with a different name to avoid conflicts
 sudo cp floating_humanize_app.py "$MACOS_DIR/floating_humanize_app.py"
 
+# Copy supporting modules next to the main script
+sudo cp job_profiler.py payload_prepass.py job_scheduler.py humanize_cassette.py hotkey_listener.py "$MACOS_DIR/"
+
 echo "✅ App installed successfully!"
 echo ""
 echo "🎉 Humanize AI is now available in your Applications folder"
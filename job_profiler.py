@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiling for Humanize AI jobs
+Keeps cProfile/tracemalloc captures only for jobs that were slow or memory hungry,
+and samples the Tk main loop when it stalls
+"""
+
+import cProfile
+import math
+import os
+import resource
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+def _env_flag(name: str) -> bool:
+    """Read a boolean switch from the environment"""
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_float(name: str, default: float, minimum: Optional[float] = None) -> float:
+    """Read a float setting from the environment, warning and falling back on bad values
+
+    Values below ``minimum`` are raised to it.
+    """
+    try:
+        value = float(os.getenv(name, default))
+        if math.isnan(value):
+            raise ValueError(name)
+    except ValueError:
+        print(f"⚠️  Ignoring invalid {name}, using {default}")
+        return default
+    if minimum is not None and value < minimum:
+        print(f"⚠️  {name} must be at least {minimum}, using {minimum}")
+        return minimum
+    return value
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class JobProfiler:
+    """Wraps jobs with cProfile + tracemalloc and keeps only the outliers
+
+    Configured from the environment:
+        HUMANIZE_PROFILE=1                turn profiling on (off by default)
+        HUMANIZE_PROFILE_DIR              where captures go
+        HUMANIZE_PROFILE_MIN_SECONDS      keep jobs slower than this (default 10)
+        HUMANIZE_PROFILE_MIN_MB           keep jobs whose traced peak exceeds this (default 50)
+        HUMANIZE_PROFILE_MAX_FILES        captures kept on disk before pruning (default 40)
+        HUMANIZE_PROFILE_MAINLOOP=1       also sample the Tk main loop for stalls
+        HUMANIZE_PROFILE_STALL_MS         main loop stall threshold (default 250)
+
+    Job captures are written as ``.prof`` files (pstats format, readable with
+    ``python -m pstats`` or snakeviz) plus ``.tracemalloc`` snapshots
+    (``tracemalloc.Snapshot.load``). Main loop stalls are written as folded
+    stacks (``.folded``), the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self):
+        self.enabled = _env_flag("HUMANIZE_PROFILE")
+        self.profile_dir = os.path.expanduser(os.getenv(
+            "HUMANIZE_PROFILE_DIR", "~/Library/Logs/HumanizeAI/profiles"))
+        self.min_seconds = env_float("HUMANIZE_PROFILE_MIN_SECONDS", 10.0, minimum=0.0)
+        self.min_peak_bytes = int(env_float("HUMANIZE_PROFILE_MIN_MB", 50.0, minimum=0.0) * 1024 * 1024)
+        self.max_files = int(env_float("HUMANIZE_PROFILE_MAX_FILES", 40, minimum=2))
+        self.profile_mainloop = self.enabled and _env_flag("HUMANIZE_PROFILE_MAINLOOP")
+        self.stall_seconds = env_float("HUMANIZE_PROFILE_STALL_MS", 250.0, minimum=10.0) / 1000.0
+
+        self._lock = threading.Lock()
+        self._active_jobs = 0
+        self._started_tracemalloc = False
+        self._watchdog = None
+
+    @contextmanager
+    def job(self, label: str = "job"):
+        """Profile the body of a job; a no-op unless profiling is enabled"""
+        if not self.enabled:
+            yield
+            return
+
+        self._start_tracing()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler already owns this interpreter (e.g. a
+            # concurrent job on Python 3.12+); fall back to memory only.
+            profile = None
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = None
+            if peak >= self.min_peak_bytes:
+                snapshot = tracemalloc.take_snapshot()
+            self._stop_tracing()
+
+            if elapsed >= self.min_seconds or peak >= self.min_peak_bytes:
+                self._save_job(label, elapsed, peak, profile, snapshot)
+
+    def _start_tracing(self):
+        """Start tracemalloc for the first concurrent job"""
+        with self._lock:
+            self._active_jobs += 1
+            if self._active_jobs == 1:
+                if tracemalloc.is_tracing():
+                    tracemalloc.reset_peak()
+                else:
+                    tracemalloc.start()
+                    self._started_tracemalloc = True
+
+    def _stop_tracing(self):
+        """Stop tracemalloc once the last concurrent job finishes"""
+        with self._lock:
+            self._active_jobs -= 1
+            if self._active_jobs == 0 and self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    def _capture_path(self, label: str, suffix: str) -> str:
+        """Build a timestamped capture path inside the profile directory"""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        safe_label = "".join(c if c.isalnum() or c in "-_." else "_" for c in label)
+        return os.path.join(self.profile_dir,
+                            f"{stamp}-{int(time.time() * 1000) % 1000:03d}-{safe_label}{suffix}")
+
+    def _save_job(self, label: str, elapsed: float, peak: int,
+                  profile: Optional[cProfile.Profile], snapshot):
+        """Write the captures for a job that crossed a threshold"""
+        try:
+            base = self._capture_path(f"{label}-{elapsed:.1f}s-{peak // (1024 * 1024)}MB", "")
+            if profile is not None:
+                profile.dump_stats(base + ".prof")
+            if snapshot is not None:
+                snapshot.dump(base + ".tracemalloc")
+            print(f"📈 Profile saved: {base} ({elapsed:.1f}s, peak {peak / (1024 * 1024):.1f} MB)")
+            self._prune()
+        except OSError as e:
+            print(f"⚠️  Could not save profile: {e}")
+
+    def _prune(self):
+        """Delete the oldest captures so the directory stays bounded"""
+        try:
+            entries = [os.path.join(self.profile_dir, name)
+                       for name in os.listdir(self.profile_dir)
+                       if name.endswith((".prof", ".tracemalloc", ".folded"))]
+        except OSError:
+            return
+
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:-self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def watch_mainloop(self, root):
+        """Start sampling the Tk main loop for stalls, if enabled"""
+        if not self.profile_mainloop or self._watchdog is not None:
+            return
+        self._watchdog = MainLoopWatchdog(self, root)
+        self._watchdog.start()
+
+    def stop(self):
+        """Stop the main loop sampler"""
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog = None
+
+
+class MainLoopWatchdog:
+    """Samples the Tk thread's stack while its event loop is not turning over
+
+    A heartbeat scheduled with ``root.after`` records when the loop last ran.
+    A background thread checks that timestamp and, while the loop is stalled,
+    samples the main thread's stack. When the stall ends the samples are
+    written as folded stacks; the cost while idle is one ``after`` callback
+    and one timestamp comparison per interval.
+    """
+
+    def __init__(self, profiler: JobProfiler, root, interval: float = 0.05):
+        self.profiler = profiler
+        self.root = root
+        self.interval = interval
+        self.last_beat = time.monotonic()
+        self.main_thread_id = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the heartbeat and the sampler thread"""
+        self._beat()
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling"""
+        self._stop.set()
+
+    def _beat(self):
+        """Record that the Tk event loop is alive"""
+        if self._stop.is_set():
+            return
+        self.last_beat = time.monotonic()
+        try:
+            self.root.after(int(self.interval * 1000), self._beat)
+        except Exception:
+            self._stop.set()
+
+    def _sample_loop(self):
+        """Collect main-thread stacks for the duration of each stall"""
+        samples: Dict[str, int] = {}
+        stall_start = None
+
+        while not self._stop.wait(self.interval):
+            lag = time.monotonic() - self.last_beat
+            if lag >= self.profiler.stall_seconds:
+                if stall_start is None:
+                    stall_start = self.last_beat
+                frame = sys._current_frames().get(self.main_thread_id)
+                if frame is not None:
+                    stack = ";".join(f"{f.name} ({os.path.basename(f.filename)}:{f.lineno})"
+                                     for f in traceback.extract_stack(frame))
+                    samples[stack] = samples.get(stack, 0) + 1
+            elif stall_start is not None:
+                self._save_stall(time.monotonic() - stall_start, samples)
+                samples = {}
+                stall_start = None
+
+    def _save_stall(self, duration: float, samples: Dict[str, int]):
+        """Write one stall's samples in folded-stack format"""
+        if not samples:
+            return
+        try:
+            path = self.profiler._capture_path(f"mainloop-stall-{duration * 1000:.0f}ms", ".folded")
+            with open(path, "w") as f:
+                for stack, count in samples.items():
+                    f.write(f"{stack} {count}\n")
+            print(f"📈 Main loop stall of {duration * 1000:.0f} ms saved: {path}")
+            self.profiler._prune()
+        except OSError as e:
+            print(f"⚠️  Could not save stall profile: {e}")
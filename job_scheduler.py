@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Priority-aware dispatch for Humanize AI requests
+Interactive hotkey jobs get reserved concurrency and rate budget, while
+background jobs yield to them between requests. Jobs carry a
+CancelToken so they can be stopped or time out at any wait
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from job_profiler import env_float
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+# Longest any single wait inside the dispatcher goes without re-checking its token
+CANCEL_CHECK_INTERVAL = 0.1
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once it has been cancelled or run past its deadline"""
+
+
+class CancelToken:
+    """Cancellation flag and deadline shared by everything a job waits on
+
+    Waits, HTTP timeouts and sleeps inside a job are all bounded by the
+    token, so cancelling it (or letting the deadline pass) frees the worker
+    at its next wait instead of after the full polling budget.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason = ""
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.deadline is not None \
+                and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cancel the job and run the registered callbacks once"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def set_deadline(self, timeout: float):
+        """Start (or restart) the deadline from now, e.g. once a queued job gets a slot"""
+        self.deadline = time.monotonic() + timeout
+
+    def add_callback(self, callback: Callable[[], None]):
+        """Call ``callback`` on cancellation, e.g. to close a session"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def check(self):
+        """Raise JobCancelled if the job should stop"""
+        if self.cancelled:
+            raise JobCancelled(self.reason)
+
+    def remaining(self, limit: Optional[float] = None) -> Optional[float]:
+        """Seconds left before the deadline, capped at ``limit``"""
+        self.check()
+        if self.deadline is None:
+            return limit
+        left = max(0.001, self.deadline - time.monotonic())
+        return left if limit is None else min(limit, left)
+
+    def sleep(self, seconds: float):
+        """Sleep that wakes up as soon as the job is cancelled"""
+        seconds = self.remaining(seconds)
+        self._event.wait(seconds)
+        self.check()
+
+
+class WaitStats:
+    """Queue-wait totals for one priority class"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, waited: float):
+        self.count += 1
+        self.total += waited
+        self.max = max(self.max, waited)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class PriorityDispatcher:
+    """Hands out job slots and request tokens in priority order
+
+    Slots bound how many jobs talk to the API at once; ``reserved_slots`` of
+    them (always at least one) can only be used by interactive jobs, so
+    ``max_slots`` is raised if needed to leave one for background work.
+    Every HTTP request also takes a
+    token from a bucket refilled at ``rate_per_minute``; lower classes may only
+    draw the bucket down to ``reserved_rate`` of its capacity, and never while
+    a higher class is waiting. Lower classes therefore pause between requests
+    whenever interactive work shows up and resume when it is done.
+    """
+
+    def __init__(self, max_slots: int = 4, reserved_slots: int = 1,
+                 rate_per_minute: float = 30, reserved_rate: float = 0.25):
+        self.reserved_slots = max(1, reserved_slots)
+        self.max_slots = max(max_slots, self.reserved_slots + 1)
+        self.capacity = max(1.0, float(rate_per_minute))
+        self.refill_per_second = self.capacity / 60.0
+        self.reserved_tokens = self.capacity * reserved_rate
+
+        self._cond = threading.Condition()
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._running = 0
+        self._waiting_slots = {p: 0 for p in PRIORITY_NAMES}
+        self._waiting_tokens = {p: 0 for p in PRIORITY_NAMES}
+        self._slot_stats = {p: WaitStats() for p in PRIORITY_NAMES}
+        self._request_stats = {p: WaitStats() for p in PRIORITY_NAMES}
+
+    @classmethod
+    def from_env(cls) -> "PriorityDispatcher":
+        """Build a dispatcher from HUMANIZE_MAX_CONCURRENT / HUMANIZE_RATE_PER_MINUTE
+
+        Each setting falls back to its own default, with a warning, when invalid.
+        """
+        max_slots = int(env_float("HUMANIZE_MAX_CONCURRENT", 4, minimum=1))
+        rate = env_float("HUMANIZE_RATE_PER_MINUTE", 30, minimum=1)
+        return cls(max_slots=max_slots, rate_per_minute=rate)
+
+    def _higher_waiting(self, waiting: Dict[int, int], priority: int) -> bool:
+        """Whether any class above ``priority`` is queued"""
+        return any(waiting[p] for p in PRIORITY_NAMES if p < priority)
+
+    def _slot_free(self, priority: int) -> bool:
+        if self._higher_waiting(self._waiting_slots, priority):
+            return False
+        limit = self.max_slots if priority == INTERACTIVE else self.max_slots - self.reserved_slots
+        return self._running < limit
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity,
+                           self._tokens + (now - self._last_refill) * self.refill_per_second)
+        self._last_refill = now
+
+    def _token_free(self, priority: int) -> bool:
+        if self._higher_waiting(self._waiting_tokens, priority):
+            return False
+        floor = 0.0 if priority == INTERACTIVE else self.reserved_tokens
+        return self._tokens - 1.0 >= floor
+
+    @contextmanager
+    def slot(self, priority: int = INTERACTIVE, token: Optional[CancelToken] = None):
+        """Hold one of the concurrent job slots for the duration of a job"""
+        start = time.monotonic()
+        with self._cond:
+            self._waiting_slots[priority] += 1
+            try:
+                while not self._slot_free(priority):
+                    if token is not None:
+                        token.check()
+                        self._cond.wait(timeout=CANCEL_CHECK_INTERVAL)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiting_slots[priority] -= 1
+            self._running += 1
+            self._slot_stats[priority].record(time.monotonic() - start)
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    def acquire_request(self, priority: int = INTERACTIVE, token: Optional[CancelToken] = None):
+        """Block until this class may send one more HTTP request"""
+        start = time.monotonic()
+        with self._cond:
+            self._waiting_tokens[priority] += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._token_free(priority):
+                        break
+                    # Sleep until roughly one token has been refilled
+                    timeout = 1.0 / self.refill_per_second
+                    if token is not None:
+                        token.check()
+                        timeout = min(timeout, CANCEL_CHECK_INTERVAL)
+                    self._cond.wait(timeout=timeout)
+            finally:
+                self._waiting_tokens[priority] -= 1
+            self._tokens -= 1.0
+            self._request_stats[priority].record(time.monotonic() - start)
+            self._cond.notify_all()
+
+    def wait_stats(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Queue-wait count, mean and max seconds per priority class
+
+        ``slot`` covers waiting for a job slot and ``request`` covers waiting
+        for rate budget before each HTTP request.
+        """
+        with self._cond:
+            return {PRIORITY_NAMES[p]: {
+                        kind: {"count": s.count, "mean": s.mean, "max": s.max}
+                        for kind, s in (("slot", self._slot_stats[p]),
+                                        ("request", self._request_stats[p]))}
+                    for p in PRIORITY_NAMES}
+
+    def format_wait_stats(self) -> str:
+        """One-line summary of queue waits for the console"""
+        parts = []
+        for name, kinds in self.wait_stats().items():
+            waits = [f"{kind} {stats['mean'] * 1000:.0f}ms avg / {stats['max'] * 1000:.0f}ms max"
+                     for kind, stats in kinds.items() if stats["count"]]
+            if waits:
+                parts.append(f"{name} " + ", ".join(waits))
+        return "; ".join(parts) or "no jobs yet"
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Payload reduction for Humanize AI requests
+Normalizes whitespace within lines, sends repeated lines once and keeps
+non-prose segments (URLs, code, numbers, citations) out of the billed
+payload, then rebuilds the full text around the humanized pieces
+
+Check: python3 payload_prepass.py
+"""
+
+import json
+import re
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+LIST_MARKER = re.compile(r'[ \t]*(?:[-*•‣◦▪]|\(?\d{1,3}[.)]|\(?[a-z]\))[ \t]+')
+CODE_HINT = re.compile(r'[{};]\s*$|^\s*(?:def|class|return|import|from|function|var|let|const|#include)\b|=>|==|!=')
+URL_ONLY = re.compile(r'(?:\s*(?:https?://|www\.)\S+)+\s*')
+CITATION_LINE = re.compile(
+    r'^\s*(?:\[\d+(?:\s*[-–,]\s*\d+)*\]|\^\d+)'                       # [1] ... or ^1 footnotes
+    r'|^\s*(?:\d+\.\s+)?[A-Z][^\s,]*,\s+(?:[A-Z]\.\s*)+.*\(\d{4}[a-z]?\)'  # Smith, J. (2020)
+    r'|\bpp?\.\s*\d+\s*[-–]\s*\d+\.?\s*$')                               # trailing pp. 12-34
+DOI = re.compile(r'\bdoi(?::|\.org/)', re.IGNORECASE)
+WORD = re.compile(r'\S+')
+# Everything str.splitlines() breaks on; Word uses \f for page breaks and \v for manual line breaks
+LINE_BREAKS = "\r\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+LINE = re.compile(r'[^\r\n\x0b\x0c\x1c-\x1e\x85\u2028\u2029]*'
+                  r'(?:\r\n|[\r\n\x0b\x0c\x1c-\x1e\x85\u2028\u2029]|$)')
+INLINE_WHITESPACE = re.compile(r'[ \t\f\v\r]+')
+MIN_PROSE_WORDS = 3
+
+
+def count_words(text: str, stop_at: Optional[int] = None) -> int:
+    """Count whitespace-separated words in one pass without building a list
+
+    With ``stop_at`` the scan ends as soon as that many words were seen,
+    which is all a minimum-length check needs.
+    """
+    words = WORD.finditer(text)
+    if stop_at is not None:
+        words = islice(words, stop_at)
+    return sum(1 for _ in words)
+
+
+def first_words(text: str, n: int) -> str:
+    """The first ``n`` words of text, joined by single spaces"""
+    return " ".join(m.group() for m in islice(WORD.finditer(text), n))
+
+
+def _json_text_body(pieces: Iterable[str]) -> bytes:
+    """JSON request body whose text is the concatenation of ``pieces``
+
+    Each piece is escaped and encoded to UTF-8 on its own, so the whole
+    text is never held as a ``str`` alongside its encoded copy.
+    """
+    parts = [b'{"text": "']
+    parts.extend(json.dumps(piece, ensure_ascii=False)[1:-1].encode('utf-8')
+                 for piece in pieces if piece)
+    parts.append(b'"}')
+    return b"".join(parts)
+
+
+class Segment:
+    """One line (or fenced code block) of the original text
+
+    Non-prose segments keep their text verbatim. Prose segments keep only
+    what is needed to put a humanized line back in place: the list marker or
+    indentation in front of it, its whitespace-normalized content (``key``)
+    and its line ending.
+    """
+
+    def __init__(self, text: Optional[str] = None, prefix: str = "",
+                 key: Optional[str] = None, ending: str = ""):
+        self.text = text
+        self.prefix = prefix
+        self.key = key
+        self.ending = ending
+
+    @property
+    def prose(self) -> bool:
+        return self.key is not None
+
+
+class PreparedPayload:
+    """The reduced text to submit, plus what is needed to rebuild the full text"""
+
+    def __init__(self, segments: List[Segment], unique_keys: List[str],
+                 original_words: int):
+        self.segments = segments
+        self.unique_keys = unique_keys
+        self.original_words = original_words
+        self.payload_words = sum(count_words(key) for key in unique_keys)
+
+    @property
+    def saved_words(self) -> int:
+        """Words kept out of the billed payload"""
+        return max(0, self.original_words - self.payload_words)
+
+    def request_body(self) -> bytes:
+        """JSON request body for the unique prose lines, one per line"""
+        return _json_text_body(self._joined_keys())
+
+    def _joined_keys(self) -> Iterator[str]:
+        for n, key in enumerate(self.unique_keys):
+            if n:
+                yield "\n"
+            yield key
+
+    def full_body(self) -> bytes:
+        """JSON request body for the whole text, for when reduction can't be used
+
+        Prose lines are sent whitespace-normalized and runs of blank lines are
+        folded into one; everything else goes verbatim. Repeated lines are
+        sent every time, so the reply can be pasted as-is.
+        """
+        return _json_text_body(self._full_pieces())
+
+    def _full_pieces(self) -> Iterator[str]:
+        previous_blank = False
+        for segment in self.segments:
+            blank = not segment.prose and not segment.text.strip(" \t\r\n")
+            if segment.prose:
+                yield segment.prefix
+                yield segment.key
+                yield segment.ending
+            elif not (blank and previous_blank):
+                yield segment.text
+            previous_blank = blank
+
+    def rebuild(self, humanized: str) -> Optional[str]:
+        """Put the humanized lines back in place of the prose segments
+
+        The payload is one unique prose line per line, and the API is
+        expected to answer line for line. If it merged or split lines the
+        pieces cannot be matched up, and None is returned rather than a
+        guess that would drop or reorder content; callers then fall back to
+        submitting ``full_body()``.
+        """
+        pieces = [line.strip() for line in humanized.splitlines() if line.strip()]
+        if len(pieces) != len(self.unique_keys):
+            return None
+        replacements = dict(zip(self.unique_keys, pieces))
+
+        return "".join(segment.text if not segment.prose
+                       else segment.prefix + replacements[segment.key] + segment.ending
+                       for segment in self.segments)
+
+
+def _line_segment(line: str) -> Segment:
+    """Classify one line, splitting off its list marker and line ending"""
+    body = line.rstrip(LINE_BREAKS)
+    ending = line[len(body):]
+    if not is_prose(body):
+        return Segment(text=line)
+
+    marker = LIST_MARKER.match(body)
+    prefix = marker.group() if marker else body[:len(body) - len(body.lstrip())]
+    key = INLINE_WHITESPACE.sub(" ", body[len(prefix):]).strip()
+    return Segment(prefix=prefix, key=key, ending=ending)
+
+
+def _split_lines(text: str) -> List[Segment]:
+    """Split text into lines, keeping fenced code blocks in one piece
+
+    Word's plain-text clipboard ends each paragraph and list item with a
+    single newline, so lines rather than blank-line paragraphs are the unit.
+    Lines are sliced off one at a time (the same breaks as
+    ``str.splitlines(keepends=True)``) instead of listing them all first.
+    """
+    lines = (m.group() for m in LINE.finditer(text) if m.end() > m.start())
+    segments = []
+    for line in lines:
+        if line.lstrip().startswith("```"):
+            # Everything up to the closing fence stays verbatim
+            block = [line]
+            for line in lines:
+                block.append(line)
+                if line.lstrip().startswith("```"):
+                    break
+            segments.append(Segment(text="".join(block)))
+        else:
+            segments.append(_line_segment(line))
+    return segments
+
+
+def is_prose(line: str) -> bool:
+    """Whether a line is worth sending for humanization"""
+    stripped = line.strip()
+    if not stripped:
+        return False
+
+    marker = LIST_MARKER.match(line)
+    content = line[marker.end():] if marker else stripped
+    if not marker and line[:1] in (" ", "\t") and CODE_HINT.search(line):
+        return False
+    if URL_ONLY.fullmatch(content):
+        return False
+    if CITATION_LINE.search(stripped) or DOI.search(stripped):
+        return False
+
+    alpha_words = islice((m for m in WORD.finditer(content)
+                          if any(c.isalpha() for c in m.group())), MIN_PROSE_WORDS)
+    if sum(1 for _ in alpha_words) < MIN_PROSE_WORDS:
+        return False
+
+    # Tables and figures: mostly digits and punctuation
+    letters = sum(1 for c in content if c.isalpha())
+    visible = sum(1 for c in content if not c.isspace())
+    return letters * 2 >= visible
+
+
+def prepare_payload(text: str) -> PreparedPayload:
+    """Reduce text to the unique prose lines that need humanizing"""
+    segments = _split_lines(text)
+    unique_keys = []
+    seen = set()
+
+    for segment in segments:
+        if segment.prose and segment.key not in seen:
+            seen.add(segment.key)
+            unique_keys.append(segment.key)
+
+    return PreparedPayload(segments, unique_keys, count_words(text))
+
+
+def self_check():
+    """Round-trip checks for line splitting and classification"""
+    for separator in ("\n", "\r\n", "\r") + tuple(LINE_BREAKS):
+        text = f"Page one text ends here now{separator}Page two text starts here now\n"
+        prepared = prepare_payload(text)
+        assert prepared.rebuild("\n".join(prepared.unique_keys)) == text, repr(separator)
+        assert prepared.rebuild("A a a a a\nB b b b b") == f"A a a a a{separator}B b b b b\n", \
+            repr(separator)
+
+    assert is_prose("1. In the year (2020) we grew a lot of revenue.")
+    assert not is_prose("1. Smith, J. (2020). Growing revenue. Journal of Things, 4, 1-9.")
+    assert not is_prose("Doe, A. B., & Roe, C. (2019a). A study of things and stuff.")
+    assert not is_prose("A study of things and stuff. Journal of Stuff, pp. 12-34.")
+
+    prepared = prepare_payload("Hi there\nGood morning\n\n\n\nSee you soon")
+    assert prepared.payload_words < 5 and prepared.original_words == 7
+    assert json.loads(prepared.full_body()) == {"text": "Hi there\nGood morning\n\nSee you soon"}
+    for text in ("a\nb", "a\r\n\r\nb\n", "\n\n", "x\r", "```\ncode;\n```\nafter\n", ""):
+        lines = [m.group() for m in LINE.finditer(text) if m.end() > m.start()]
+        assert lines == text.splitlines(keepends=True), repr(text)
+    print("✅ payload_prepass checks passed")
+
+
+if __name__ == "__main__":
+    self_check()